@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+#
+# Benchmark the L-system, turtle and path walking scripts
+#
+# The scripts in lib/texts are run in plain CPython against the stand-in bpy
+# and mathutils modules in bench/stubs. Results are saved as JSON and may be
+# compared with a stored baseline to catch regressions.
+#
+# Every case is timed several times, each time right after a fixed
+# calibration workload, and the median of its time relative to the
+# calibration is compared. This follows changes in machine speed during a run
+# as well as between machines, so a baseline recorded on one machine can be
+# checked on another. Cases slower relative to the calibration than the
+# baseline by more than the tolerance fail the run unless --report-only.
+#
+#   bench/benchmark.py --output bench_results.json --compare bench/baseline.json
+#   bench/benchmark.py --output bench/baseline.json
+#
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, 'stubs'))
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir, 'lib', 'texts'))
+
+import bpy
+import CrushGraphics
+import GeometryStream
+import PathWalker
+import SystemL
+import SystemLRules
+
+from mathutils import (
+    Vector
+)
+
+# L-system builders and the iteration counts to benchmark them at
+BUILDERS = [
+    'systeml_algae',
+    'systeml_pythagoras_tree',
+    'systeml_cantor_set',
+    'systeml_koch_curve',
+    'systeml_koch_snowflake',
+    'systeml_sierpinski_triangle',
+    'systeml_sierpinski_curve',
+    'systeml_dragon_curve',
+]
+ITERATIONS = (3, 6, 9)
+
+# SystemLRules builders taking a seed
+STOCHASTIC_BUILDERS = [
+    'systeml_algae_stochastic',
+    'systeml_pythagoras_tree_stochastic',
+]
+
+# systeml_compile_slow is quadratic, skip it for longer outputs
+SLOW_MAX_LENGTH = 50000
+
+SPLINE_TYPES = ('POLY', 'NURBS', 'BEZIER')
+
+
+def builder_rules(builder):
+    """ Capture the axiom and rules a builder passes to systeml_compile """
+    captured = []
+    compile_function = SystemL.systeml_compile
+
+    def capture(axiom, rules, iterations):
+        captured.append((axiom, rules))
+        return axiom
+
+    SystemL.systeml_compile = capture
+    try:
+        getattr(SystemL, builder)(0)
+    finally:
+        SystemL.systeml_compile = compile_function
+    return captured[0]
+
+
+def crush_renderer(turtle, angle):
+    """ Turtle renderer for the dragon and snowflake curves """
+    return {
+        "F": lambda: turtle.forward(1),
+        "+": lambda: turtle.turn(angle),
+        "-": lambda: turtle.turn(-angle),
+        "X": None,
+        "Y": None,
+    }
+
+
+def new_curve_object(name, spline_type, splines, steps):
+    """ A curve object with splines zig-zagging through steps control points """
+    curve_data = bpy.data.curves.new(name, type='CURVE')
+    for index in range(splines):
+        spline = curve_data.splines.new(type=spline_type)
+        if spline_type == 'BEZIER':
+            points = spline.bezier_points
+            width = 3
+        else:
+            points = spline.points
+            width = 4
+        points.add(steps - 1)
+        points.foreach_set('co', [
+            value for step in range(steps)
+            for value in (float(step), float(step % 2), float(index), 1.0)
+            [:width]])
+        for point in points:
+            point.handle_left = point.co.xyz - Vector((0.25, 0.0, 0.0))
+            point.handle_right = point.co.xyz + Vector((0.25, 0.0, 0.0))
+    curve = bpy.data.objects.new(name, curve_data)
+    bpy.context.scene.objects.link(curve)
+    return curve
+
+
+def benchmarks():
+    """ Map of benchmark name to a function to time """
+    cases = {}
+
+    for builder in BUILDERS:
+        axiom, rules = builder_rules(builder)
+        for iterations in ITERATIONS:
+            name = "%s/%d" % (builder, iterations)
+            cases["compile/" + name] = \
+                lambda a=axiom, r=rules, i=iterations: \
+                SystemL.systeml_compile(a, r, i)
+            cases["compile_rules/" + name] = \
+                lambda a=axiom, r=rules, i=iterations: \
+                SystemLRules.systeml_compile_rules(a, r, i)
+            length = len(SystemL.systeml_compile(axiom, rules, iterations))
+            if length <= SLOW_MAX_LENGTH:
+                cases["compile_slow/" + name] = \
+                    lambda a=axiom, r=rules, i=iterations: \
+                    SystemL.systeml_compile_slow(a, r, i)
+
+    for builder in STOCHASTIC_BUILDERS:
+        for iterations in ITERATIONS:
+            cases["compile_rules/%s/%d" % (builder, iterations)] = \
+                lambda b=builder, i=iterations: \
+                getattr(SystemLRules, b)(i, seed=1)
+    cases["compile_rules/systeml_algae_signal/100"] = \
+        lambda: SystemLRules.systeml_algae_signal(100)
+    cases["compile_rules/systeml_tree_signal/100"] = \
+        lambda: SystemLRules.systeml_tree_signal(100)
+
+    dragon = SystemL.systeml_dragon_curve(14)
+    nop = {symbol: (lambda: None) for symbol in set(dragon)}
+    cases["execute/dragon/14"] = \
+        lambda: SystemL.systeml_execute(dragon, nop)
+    dropped = dict(nop, X=None, Y=None)
+    cases["execute/dragon/14/dropped"] = \
+        lambda: SystemL.systeml_execute(dragon, dropped)
+    fused = {"F+": lambda: None, "F-": lambda: None}
+    cases["execute/dragon/14/fused"] = \
+        lambda: SystemL.systeml_execute(dragon, dropped, fused=fused)
+
+    def interpret_squirt():
+        squirt = CrushGraphics.Squirt()
+        renderer = {
+            "F": lambda: squirt.forward(1),
+            "+": lambda: squirt.turn(CrushGraphics.PI_BY_TWO),
+            "-": lambda: squirt.turn(-CrushGraphics.PI_BY_TWO),
+            "X": None,
+            "Y": None,
+        }
+        SystemL.systeml_execute(dragon_10, renderer)
+    dragon_10 = SystemL.systeml_dragon_curve(10)
+    cases["interpret/squirt/dragon/10"] = interpret_squirt
+
+    for depth in (4, 6):
+        cases["compile_levels/koch_snowflake/%d" % depth] = \
+            lambda d=depth: list(SystemL.systeml_compile_levels(
+                SystemL.KOCH_SNOWFLAKE_AXIOM, SystemL.KOCH_SNOWFLAKE_RULES,
+                d))
+
+    def interpret_snowflake(repeat):
+        squirt = CrushGraphics.Squirt()
+        angle = CrushGraphics.PI_BY_THREE
+        renderer = {
+            "F": lambda: squirt.forward(1),
+            "+": lambda: squirt.turn(angle),
+            "-": lambda: squirt.turn(-angle),
+        }
+        symbol_to_repeat = None
+        if repeat:
+            symbol_to_repeat = {"+": lambda count: squirt.turn(count * angle)}
+        SystemL.systeml_execute(snowflake_5, renderer, symbol_to_repeat)
+    snowflake_5 = SystemL.systeml_koch_snowflake(5)
+    cases["interpret/squirt/koch_snowflake/5"] = \
+        lambda: interpret_snowflake(False)
+    cases["interpret/squirt/koch_snowflake/5/repeat"] = \
+        lambda: interpret_snowflake(True)
+
+    for spline_type in SPLINE_TYPES:
+        def interpret_crush(spline_type=spline_type):
+            bpy.reset()
+            turtle = CrushGraphics.Crush("Dragon", spline_type)
+            turtle.pen_down()
+            SystemL.systeml_execute(
+                dragon_10, crush_renderer(turtle, CrushGraphics.PI_BY_TWO))
+            turtle.pen_up()
+        cases["interpret/crush/%s/dragon/10" % spline_type] = interpret_crush
+
+    def stream_crush():
+        bpy.reset()
+        name = os.path.join(stream_dir.name, "Dragon")
+        with GeometryStream.GeometryWriter(name) as stream:
+            turtle = CrushGraphics.Crush("Dragon", 'POLY', stream=stream)
+            turtle.pen_down()
+            SystemL.systeml_execute(
+                dragon_10, crush_renderer(turtle, CrushGraphics.PI_BY_TWO))
+            turtle.pen_up()
+    stream_dir = tempfile.TemporaryDirectory()
+    atexit.register(stream_dir.cleanup)
+    cases["interpret/crush/stream/dragon/10"] = stream_crush
+
+    path = [[float(index), float(index % 7), 0.0] for index in range(10000)]
+    for spline_type in SPLINE_TYPES:
+        cases["verts_to_points/%s/10000" % spline_type] = \
+            lambda s=spline_type: CrushGraphics.verts_to_points(path, s)
+
+    squirt = CrushGraphics.Squirt()
+    for symbol in SystemL.systeml_koch_snowflake(6):
+        if symbol == "F":
+            squirt.forward(1.0 / pow(3, 6))
+        else:
+            squirt.turn(CrushGraphics.PI_BY_THREE if symbol == "+"
+                        else -CrushGraphics.PI_BY_THREE)
+    snowflake_path = squirt.path
+    cases["simplify_path/koch_snowflake/6"] = \
+        lambda: CrushGraphics.simplify_path(snowflake_path, 1.0 / pow(3, 4))
+
+    for spline_type in SPLINE_TYPES:
+        bpy.reset()
+        curve = new_curve_object("Plan", spline_type, 1, 50)
+        data = PathWalker.spline_data(curve, curve.data.splines[0])
+        cases["plan_spline/%s/500" % spline_type] = \
+            lambda d=data: PathWalker.plan_spline(d, 500)
+
+    def walk(curves=4, splines=4, steps=100):
+        bpy.reset()
+        for index in range(curves):
+            curve = new_curve_object("Walk%d" % index, 'NURBS', splines, 20)
+            curve.select = True
+            bpy.context.selected_objects.append(curve)
+        walker = PathWalker.PathWalker()
+        walker.number = steps
+        walker.simulation_type = 'RigidBodyPhysics'
+        walker.execute(bpy.context)
+    cases["path_walker/4x4x100"] = walk
+
+    return cases
+
+
+# Calls of the calibration workload timed before each repeat of a case
+CALIBRATION_NUMBER = 3
+
+
+def calibration_workload():
+    """ Plain Python work typical of the cases: calls, lookups, string and
+        float operations """
+    table = {symbol: index for index, symbol in enumerate("F+-XY[]")}
+    total = 0.0
+    for symbol in "FX+YF-[F+F]" * 2000:
+        total += table[symbol] * 0.5
+    lsystem = "FX"
+    for iteration in range(10):
+        lsystem = lsystem.translate({ord("X"): "X+YF+", ord("Y"): "-FX-Y"})
+    return lsystem, total
+
+
+def run(cases, repeat):
+    """ Median seconds per call and median time relative to the calibration
+        workload for each case, and the median calibration seconds """
+    results = {}
+    relative = {}
+    calibrations = []
+    calibration_timer = timeit.Timer(calibration_workload)
+    for name in sorted(cases):
+        timer = timeit.Timer(cases[name])
+        number, elapsed = timer.autorange()
+        seconds = []
+        ratios = []
+        for index in range(repeat):
+            calibration = calibration_timer.timeit(CALIBRATION_NUMBER) / \
+                CALIBRATION_NUMBER
+            seconds.append(timer.timeit(number) / number)
+            ratios.append(seconds[-1] / calibration)
+            calibrations.append(calibration)
+        results[name] = statistics.median(seconds)
+        relative[name] = statistics.median(ratios)
+        print("%-50s %12.6fs" % (name, results[name]))
+    return results, relative, statistics.median(calibrations)
+
+
+def compare(results, relative, baseline, tolerance):
+    """ Print cases slower relative to the calibration than in baseline by
+        more than tolerance and return how many there were """
+    regressions = 0
+    for name in sorted(relative):
+        if name not in baseline:
+            continue
+        ratio = relative[name] / baseline[name]
+        if ratio > 1.0 + tolerance:
+            regressions += 1
+            # the baseline seconds at this run's calibration speed
+            print("REGRESSION %-39s %6.2fx %12.6fs > %12.6fs" % (
+                name, ratio, results[name], results[name] / ratio))
+    return regressions
+
+
+def main():
+    """ Run the benchmarks saving and comparing results """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the L-system and path scripts")
+    parser.add_argument('--output', default=None,
+                        help="JSON file to save results to")
+    parser.add_argument('--compare', default=None,
+                        help="baseline JSON file to compare results with")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown relative to the baseline")
+    parser.add_argument('--report-only', action='store_true',
+                        help="report regressions without failing")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="number of timing repeats, the median is kept")
+    parser.add_argument('--filter', default='',
+                        help="only run cases whose name contains this")
+    args = parser.parse_args()
+
+    cases = {name: case for name, case in benchmarks().items()
+             if args.filter in name}
+    results, relative, calibration = run(cases, args.repeat)
+    print("%-50s %12.6fs" % ("calibration", calibration))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'calibration': calibration,
+                'relative': relative,
+                'results': results,
+            }, output, indent=2, sort_keys=True)
+            output.write("\n")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print("calibration %.2fx baseline" % (
+            calibration / baseline['calibration']))
+        regressions = compare(results, relative, baseline['relative'],
+                              args.tolerance)
+        if regressions:
+            print("%d regressions" % regressions)
+            if not args.report_only:
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
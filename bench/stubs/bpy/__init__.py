@@ -0,0 +1,184 @@
+################################################################################
+#
+# Stand-in for Blender's bpy module
+#
+# A lightweight imitation of the parts of bpy used by the scripts in lib/texts
+# so that they can be benchmarked in plain CPython. Data blocks are simple
+# Python objects and operators do nothing.
+#
+################################################################################
+from mathutils import (
+    Matrix,
+    Vector
+)
+
+from . import (
+    path,
+    props,
+    types
+)
+
+
+class Stub(object):
+    """ Permissive object - unknown attributes are created on demand and calls
+        do nothing """
+
+    def __init__(self, **attributes):
+        """ Ctor """
+        self.__dict__.update(attributes)
+
+    def __getattr__(self, name):
+        """ Create missing attributes on demand """
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = Stub()
+        setattr(self, name, value)
+        return value
+
+    def __call__(self, *args, **kwargs):
+        """ Calling a stub does nothing """
+        return Stub()
+
+
+class Collection(list):
+    """ A bpy_collection of named data blocks """
+
+    def __init__(self, factory=None):
+        """ factory creates the data block for new() """
+        list.__init__(self)
+        self.factory = factory
+
+    def new(self, *args, **kwargs):
+        """ Create, add and return a new data block """
+        block = self.factory(*args, **kwargs)
+        self.append(block)
+        return block
+
+    def link(self, block):
+        """ Add an existing data block """
+        self.append(block)
+
+    def unlink(self, block):
+        """ Remove a data block """
+        list.remove(self, block)
+
+    def remove(self, block, do_unlink=False):
+        """ Remove a data block """
+        list.remove(self, block)
+
+    def find(self, name):
+        """ Index of the named block or -1 """
+        for index, block in enumerate(self):
+            if block.name == name:
+                return index
+        return -1
+
+    def __getitem__(self, key):
+        """ Look up a block by index or name """
+        if isinstance(key, str):
+            index = self.find(key)
+            if index == -1:
+                raise KeyError(key)
+            key = index
+        return list.__getitem__(self, key)
+
+
+class Points(list):
+    """ Spline points supporting add() and foreach_set() """
+
+    def __init__(self, width):
+        """ width components per point, 4 for points and 3 for bezier """
+        list.__init__(self)
+        self.width = width
+        self.add(1)
+
+    def add(self, count):
+        """ Append count points """
+        for index in range(count):
+            self.append(Stub(co=Vector((0.0,) * self.width),
+                             handle_left=Vector(), handle_right=Vector()))
+
+    def foreach_set(self, attribute, values):
+        """ Set attribute of every point from a flat sequence """
+        width = self.width
+        for index, point in enumerate(self):
+            setattr(point, attribute,
+                    Vector(values[index * width:(index + 1) * width]))
+
+
+class Spline(Stub):
+    """ A curve spline """
+
+    def __init__(self, type='POLY'):
+        """ Ctor """
+        Stub.__init__(self, type=type, points=Points(4),
+                      bezier_points=Points(3), order_u=4, use_cyclic_u=False,
+                      use_endpoint_u=False, resolution_u=12)
+
+
+class CurveData(Stub, types.Curve):
+    """ Curve data block """
+
+    def __init__(self, name, type='CURVE'):
+        """ Ctor """
+        Stub.__init__(self, name=name, type=type, eval_time=0.0,
+                      path_duration=100, use_path=False,
+                      splines=Collection(Spline))
+
+
+class Object(Stub):
+    """ An object data block """
+
+    def __init__(self, name, object_data=None):
+        """ Ctor """
+        Stub.__init__(self, name=name, data=object_data, location=Vector(),
+                      matrix_world=Matrix(),
+                      select=False, mode='OBJECT', users=0)
+        self.type = 'CURVE' if isinstance(object_data, CurveData) else 'MESH'
+
+
+class Group(Stub):
+    """ A group of objects """
+
+    def __init__(self, name):
+        """ Ctor """
+        Stub.__init__(self, name=name, objects=Collection())
+
+
+class Scene(Stub):
+    """ The scene """
+
+    def __init__(self):
+        """ Ctor """
+        Stub.__init__(self, objects=Collection())
+        self.objects.active = None
+
+
+def reset():
+    """ Start again with empty data and a fresh scene """
+    global context, data
+    scene = Scene()
+    data = Stub(
+        actions=Collection(lambda name: Stub(name=name)),
+        curves=Collection(CurveData),
+        groups=Collection(Group),
+        materials=Collection(lambda name: Stub(name=name)),
+        meshes=Collection(lambda name: Stub(name=name, materials=[])),
+        objects=Collection(Object))
+    context = Stub(
+        active_object=None,
+        scene=scene,
+        screen=Stub(areas=[
+            Stub(type='VIEW_3D', spaces=[Stub(cursor_location=Vector())])]),
+        selected_objects=[])
+
+
+ops = Stub()
+
+utils = Stub()
+
+context = None
+
+data = None
+
+reset()
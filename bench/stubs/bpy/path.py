@@ -0,0 +1,13 @@
+################################################################################
+#
+# Stand-in for bpy.path
+#
+################################################################################
+import os
+
+
+def abspath(path):
+    """ Blender relative paths are relative to the working directory """
+    if path.startswith('//'):
+        path = path[2:]
+    return os.path.abspath(path)
@@ -0,0 +1,23 @@
+################################################################################
+#
+# Stand-in for bpy.props - properties simply hold their default value
+#
+################################################################################
+
+
+def _property(default=None, **kwargs):
+    """ Property declarations evaluate to their default """
+    return default
+
+
+BoolProperty = _property
+
+EnumProperty = _property
+
+FloatProperty = _property
+
+FloatVectorProperty = _property
+
+IntProperty = _property
+
+StringProperty = _property
@@ -0,0 +1,33 @@
+################################################################################
+#
+# Stand-in for bpy.types
+#
+################################################################################
+
+
+class Operator(object):
+    """ Blender operator base class """
+
+    def report(self, type, message):
+        """ Print operator reports """
+        print("%s: %s" % (", ".join(sorted(type)), message))
+
+
+class Panel(object):
+    """ Blender panel base class """
+
+
+class Curve(object):
+    """ Curve data type """
+
+
+class VIEW3D_MT_object(object):
+    """ Object menu """
+
+    @classmethod
+    def append(cls, function):
+        """ Menu entries are ignored """
+
+    @classmethod
+    def remove(cls, function):
+        """ Menu entries are ignored """
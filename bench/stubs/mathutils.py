@@ -0,0 +1,186 @@
+################################################################################
+#
+# Stand-in for Blender's mathutils module
+#
+# Just enough of Vector, Quaternion and Euler for the scripts in lib/texts to
+# run in plain CPython for benchmarking.
+#
+################################################################################
+from math import (
+    atan2,
+    asin,
+    cos,
+    hypot,
+    sin
+)
+
+
+class Vector(object):
+    """ A 3 or 4 component vector """
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        """ Ctor """
+        self.values = [float(value) for value in values]
+
+    def __copy__(self):
+        """ Copy support for copy.copy """
+        return Vector(self.values)
+
+    def copy(self):
+        """ Return a copy of this vector """
+        return Vector(self.values)
+
+    def __len__(self):
+        """ Number of components """
+        return len(self.values)
+
+    def __iter__(self):
+        """ Iterate components """
+        return iter(self.values)
+
+    def __getitem__(self, index):
+        """ Component by index """
+        return self.values[index]
+
+    def __repr__(self):
+        """ Debug representation """
+        return "Vector(%s)" % (tuple(self.values),)
+
+    @property
+    def x(self):
+        """ X component """
+        return self.values[0]
+
+    @property
+    def y(self):
+        """ Y component """
+        return self.values[1]
+
+    @property
+    def z(self):
+        """ Z component """
+        return self.values[2]
+
+    @property
+    def w(self):
+        """ W component """
+        return self.values[3]
+
+    @property
+    def xyz(self):
+        """ First three components as a Vector """
+        return Vector(self.values[:3])
+
+    @property
+    def length(self):
+        """ Euclidean length """
+        return sum(value * value for value in self.values) ** 0.5
+
+    def __add__(self, other):
+        """ Component-wise sum """
+        return Vector([a + b for a, b in zip(self.values, other)])
+
+    def __sub__(self, other):
+        """ Component-wise difference """
+        return Vector([a - b for a, b in zip(self.values, other)])
+
+    def __mul__(self, scalar):
+        """ Scale by a number """
+        return Vector([a * scalar for a in self.values])
+
+    __rmul__ = __mul__
+
+    def rotate(self, quaternion):
+        """ Rotate in place by a Quaternion """
+        self.values = quaternion.rotated(self.values)
+
+    def to_track_quat(self, track, up):
+        """ Quaternion pointing the track axis along this vector keeping the up
+            axis upwards. Only the 'X', 'Z' combination is supported. """
+        if (track, up) != ('X', 'Z'):
+            raise NotImplementedError("to_track_quat(%s, %s)" % (track, up))
+        x, y, z = self.values[:3]
+        yaw = Quaternion((0, 0, 1), atan2(y, x))
+        pitch = Quaternion((0, 1, 0), -atan2(z, hypot(x, y)))
+        return yaw * pitch
+
+
+class Quaternion(object):
+    """ A rotation quaternion built from an axis and an angle """
+
+    def __init__(self, axis=(1, 0, 0), angle=0.0):
+        """ Ctor """
+        half = angle / 2.0
+        scale = sin(half)
+        self.w = cos(half)
+        self.x = axis[0] * scale
+        self.y = axis[1] * scale
+        self.z = axis[2] * scale
+
+    def __mul__(self, other):
+        """ Hamilton product """
+        product = Quaternion()
+        product.w = self.w * other.w - self.x * other.x - \
+            self.y * other.y - self.z * other.z
+        product.x = self.w * other.x + self.x * other.w + \
+            self.y * other.z - self.z * other.y
+        product.y = self.w * other.y - self.x * other.z + \
+            self.y * other.w + self.z * other.x
+        product.z = self.w * other.z + self.x * other.y - \
+            self.y * other.x + self.z * other.w
+        return product
+
+    def rotated(self, values):
+        """ Components of values rotated by this quaternion """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        vx, vy, vz = values[:3]
+        tx = 2.0 * (y * vz - z * vy)
+        ty = 2.0 * (z * vx - x * vz)
+        tz = 2.0 * (x * vy - y * vx)
+        return [vx + w * tx + y * tz - z * ty,
+                vy + w * ty + z * tx - x * tz,
+                vz + w * tz + x * ty - y * tx]
+
+    def to_euler(self):
+        """ XYZ euler angles of the rotation """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        return Euler((
+            atan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y)),
+            asin(max(-1.0, min(1.0, 2.0 * (w * y - z * x)))),
+            atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))))
+
+
+class Euler(Vector):
+    """ XYZ euler rotation """
+
+
+class Matrix(object):
+    """ A 4x4 transformation matrix """
+
+    def __init__(self, rows=None):
+        """ Ctor - identity by default """
+        if rows is None:
+            rows = [[1.0 if row == column else 0.0 for column in range(4)]
+                    for row in range(4)]
+        self.rows = [list(row) for row in rows]
+
+    @classmethod
+    def Translation(cls, vector):
+        """ A translation matrix """
+        matrix = cls()
+        for row in range(3):
+            matrix.rows[row][3] = vector[row]
+        return matrix
+
+    @property
+    def translation(self):
+        """ Translation part of the matrix """
+        return Vector([self.rows[row][3] for row in range(3)])
+
+    def __mul__(self, vector):
+        """ Transform a 3D point or 4D vector """
+        values = list(vector)
+        if len(values) == 3:
+            values.append(1.0)
+        product = [sum(a * b for a, b in zip(row, values)) for row in self.rows]
+        return Vector(product[:len(vector)])
@@ -11,6 +11,7 @@
 ################################################################################
 import bpy
 import copy
+import numpy
 
 from math import (
     pi as PI,
@@ -31,6 +32,10 @@ PI_BY_TWO = PI / 2.0
 # 60 degrees
 PI_BY_THREE = PI / 3.0
 
+# Functions instrumented when profiling is enabled
+HOT_PATHS = ('simplify_path', 'verts_to_points', 'create_curve',
+             'setBezierHandles')
+
 
 def areas_tuple():
     """ Get map of screen area to index in list """
@@ -42,6 +47,13 @@ def areas_tuple():
     return res
 
 
+def cursor_location():
+    """ Copy of the 3D cursor location in the 3D view """
+    areas = areas_tuple()
+    view3d = bpy.context.screen.areas[areas['VIEW_3D']].spaces[0]
+    return copy.copy(view3d.cursor_location)
+
+
 def verts_to_points(verts, spline_type):
     """
     Adapted from blenders curave_aceous module.
@@ -65,6 +77,38 @@ def verts_to_points(verts, spline_type):
     return vert_array
 
 
+def simplify_path(path, tolerance):
+    """ Ramer-Douglas-Peucker simplification of a list of [x, y, z] points
+        keeping every point further than tolerance from the simplified path """
+    if tolerance <= 0 or len(path) < 3:
+        return path
+    points = numpy.array(path, dtype=numpy.float64)
+    keep = numpy.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    segments = [(0, len(points) - 1)]
+    while segments:
+        first, last = segments.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        chord = points[last] - start
+        offsets = points[first + 1:last] - start
+        length = numpy.dot(chord, chord)
+        if length > 0:
+            # distance from the chord line
+            along = numpy.outer(numpy.dot(offsets, chord) / length, chord)
+            distances = numpy.linalg.norm(offsets - along, axis=1)
+        else:
+            distances = numpy.linalg.norm(offsets, axis=1)
+        furthest = int(numpy.argmax(distances))
+        if distances[furthest] > tolerance:
+            split = first + 1 + furthest
+            keep[split] = True
+            segments.append((first, split))
+            segments.append((split, last))
+    return [point for point, kept in zip(path, keep) if kept]
+
+
 def setBezierHandles(obj, mode):
     """
     Adapted from blenders curave_aceous module.
@@ -123,6 +167,52 @@ def create_curve(context, name, vert_array, self, align_matrix):
     return new_obj
 
 
+def create_curve_from_stream(context, name, reader, self, align_matrix):
+    """
+    Create new CurveObject with a spline for each spline in a geometry stream
+    setting the points of each spline with a single foreach_set. Each spline
+    is simplified to self.tolerance as it is read.
+    """
+    spline_type = self.spline_type
+
+    scene = context.scene
+    new_curve = bpy.data.curves.new(name + '-curve', type='CURVE')
+
+    for points in reader:
+        points = numpy.asarray(simplify_path(points, self.tolerance))
+        new_spline = new_curve.splines.new(type=spline_type)
+        if spline_type == 'BEZIER':
+            new_spline.bezier_points.add(len(points) - 1)
+            new_spline.bezier_points.foreach_set(
+                'co', numpy.ascontiguousarray(points).ravel())
+        else:
+            # w=1 for nurbs, w=0 for poly as in verts_to_points
+            co = numpy.zeros((len(points), 4), dtype=numpy.float32)
+            co[:, :3] = points
+            if spline_type == 'NURBS':
+                co[:, 3] = 1
+            new_spline.points.add(len(points) - 1)
+            new_spline.points.foreach_set('co', co.ravel())
+        new_spline.use_cyclic_u = self.use_cyclic_u
+        new_spline.use_endpoint_u = self.endp_u
+        new_spline.order_u = self.order_u
+
+    new_curve.dimensions = '2D'
+    new_curve.use_path = self.use_path
+
+    new_obj = bpy.data.objects.new(name + '-object', new_curve)
+    scene.objects.link(new_obj)
+    new_obj.select = True
+    scene.objects.active = new_obj
+    if align_matrix:
+        new_obj.matrix_world = align_matrix
+
+    if spline_type == 'BEZIER':
+        setBezierHandles(new_obj, self.handle_type)
+
+    return new_obj
+
+
 class Squirt(object):
     """ State for Crush """
 
@@ -133,10 +223,15 @@ class Squirt(object):
         self.location = Vector()
         self.path = [[0, 0, 0]]
         self.spline_type = None
+        # GeometryStream.GeometryWriter to stream the path to
+        self.stream = None
 
     def new_path(self):
         """ Sart a new path """
-        self.path = []
+        if self.stream is not None:
+            self.path = self.stream.new_spline()
+        else:
+            self.path = []
         self.extend_path()
 
     def extend_path(self):
@@ -169,9 +264,14 @@ class Squirt(object):
 class Crush(object):
     """ A turtle graphics like object for paths in Blender. A path history
         is constructed and rendered as a single curve when pen_up() is
-        invoked. """
+        invoked.
 
-    def __init__(self, group_name, spline_type):
+        Given a GeometryStream.GeometryWriter paths are instead streamed to
+        disk as they are drawn, each pen_up() ending a spline. The stream
+        may be turned into a single curve later with import_stream(), which
+        is when tolerance is applied. """
+
+    def __init__(self, group_name, spline_type, stream=None):
         """ Initially place ourselves at the 3D cursor """
         # Curve is closed
         self.use_cyclic_u = False
@@ -183,15 +283,18 @@ class Crush(object):
         self.use_path = True
         # For Bezier curve
         self.handle_type = 'AUTOMATIC'
+        # Simplify paths keeping points further than this from the curve
+        self.tolerance = 0.0
         self.group = bpy.data.groups.new(group_name)
         # 'POLY', 'NURBS' or 'BEZIER'
         self.spline_type = spline_type
-        areas = areas_tuple()
-        view3d = bpy.context.screen.areas[areas['VIEW_3D']].spaces[0]
         self.state = [Squirt()]
         self.state[-1].spline_type = self.spline_type
-        self.state[-1].location = \
-            copy.copy(view3d.cursor_location)
+        self.state[-1].location = cursor_location()
+        self.stream = stream
+        if stream is not None:
+            self.state[-1].stream = stream
+            self.state[-1].new_path()
 
     def pen_up(self):
         """ Raise the pen """
@@ -225,12 +328,27 @@ class Crush(object):
     def create_path(self):
         """ Take current state and render its path as a curve """
         state = self.state[-1]
-        vertex_array = verts_to_points(state.path, self.spline_type)
+        if self.stream is not None:
+            state.new_path()
+            return
+        path = simplify_path(state.path, self.tolerance)
+        vertex_array = verts_to_points(path, self.spline_type)
         curve = create_curve(bpy.context, self.group.name,
             vertex_array, self, None)
         self.group.objects.link(curve)
         state.new_path()
 
+    def import_stream(self):
+        """ Close the stream and create a curve from its files """
+        # only loaded for streams so the GeometryStream text is optional
+        import GeometryStream
+        self.stream.close()
+        reader = GeometryStream.GeometryReader(self.stream.name)
+        curve = create_curve_from_stream(bpy.context, self.group.name,
+                                         reader, self, None)
+        self.group.objects.link(curve)
+        return curve
+
 
 def test():
     """ Used to test during development """
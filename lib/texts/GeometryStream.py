@@ -0,0 +1,172 @@
+################################################################################
+#
+# Geometry streams
+#
+# Stream path points to disk as they are generated so that very large paths
+# never have to be held in Python lists. A stream is a pair of files:
+#
+#   <name>.verts    float32 x, y, z for every point
+#   <name>.splines  uint64 (first point, point count) for every spline
+#
+# both in native byte order. A GeometryReader memory maps them for export to
+# OBJ or SVG or for bulk import into Blender one spline at a time.
+#
+################################################################################
+import numpy
+
+from array import (
+    array
+)
+
+
+VERTEX_SUFFIX = '.verts'
+
+SPLINE_SUFFIX = '.splines'
+
+# Points buffered in memory before being written out
+CHUNK_POINTS = 65536
+
+
+class GeometryWriter(object):
+    """ Write points to a geometry stream a spline at a time. Squirt uses the
+        writer in place of its path list: append() adds a point to the current
+        spline and len() is the number of points in it. """
+
+    def __init__(self, name, chunk_points=CHUNK_POINTS):
+        """ Create or truncate the stream files for name """
+        self.name = name
+        self.chunk_values = chunk_points * 3
+        self.vertex_file = open(name + VERTEX_SUFFIX, 'wb')
+        self.spline_file = open(name + SPLINE_SUFFIX, 'wb')
+        self.buffer = array('f')
+        self.spline_start = 0
+        self.spline_points = 0
+
+    def __enter__(self):
+        """ Use as a context manager """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Close on leaving the context """
+        self.close()
+        return False
+
+    def __len__(self):
+        """ Number of points in the current spline """
+        return self.spline_points
+
+    def append(self, point):
+        """ Add an x, y, z point to the current spline """
+        self.buffer.extend(point[:3])
+        self.spline_points += 1
+        if len(self.buffer) >= self.chunk_values:
+            self.flush()
+
+    def new_spline(self):
+        """ End the current spline and start another returning self """
+        self.end_spline()
+        return self
+
+    def end_spline(self):
+        """ Index the current spline, single points are not splines """
+        if self.spline_points > 1:
+            array('Q', (self.spline_start, self.spline_points)).tofile(
+                self.spline_file)
+        self.spline_start += self.spline_points
+        self.spline_points = 0
+
+    def flush(self):
+        """ Write buffered points to disk """
+        self.buffer.tofile(self.vertex_file)
+        del self.buffer[:]
+
+    def close(self):
+        """ End the current spline and close the stream files """
+        if self.vertex_file.closed:
+            return
+        self.end_spline()
+        self.flush()
+        self.vertex_file.close()
+        self.spline_file.close()
+
+
+def load(name, dtype, width):
+    """ Memory map a stream file as rows of width values """
+    try:
+        return numpy.memmap(name, dtype=dtype, mode='r').reshape(-1, width)
+    except ValueError:
+        # empty files cannot be mapped
+        return numpy.zeros((0, width), dtype=dtype)
+
+
+class GeometryReader(object):
+    """ Memory mapped access to a geometry stream """
+
+    def __init__(self, name):
+        """ Map the stream files for name """
+        self.name = name
+        self.vertices = load(name + VERTEX_SUFFIX, numpy.float32, 3)
+        self.splines = load(name + SPLINE_SUFFIX, numpy.uint64, 2)
+
+    def __len__(self):
+        """ Number of splines """
+        return len(self.splines)
+
+    def spline(self, index):
+        """ Points of a spline as an (n, 3) float32 array view """
+        start, count = (int(value) for value in self.splines[index])
+        return self.vertices[start:start + count]
+
+    def __iter__(self):
+        """ Iterate the points of each spline """
+        for index in range(len(self.splines)):
+            yield self.spline(index)
+
+    def bounds(self):
+        """ Minimum and maximum corners of all points """
+        if len(self.vertices) == 0:
+            return numpy.zeros(3), numpy.zeros(3)
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+
+
+def write_obj(reader, filename):
+    """ Export a stream as OBJ polylines one spline at a time """
+    with open(filename, 'w') as obj_file:
+        obj_file.write("# %s\n" % reader.name)
+        first = 1
+        for points in reader:
+            numpy.savetxt(obj_file, points, fmt='v %.6f %.6f %.6f')
+            obj_file.write("l")
+            for start in range(first, first + len(points), CHUNK_POINTS):
+                end = min(start + CHUNK_POINTS, first + len(points))
+                obj_file.write(" " + " ".join(map(str, range(start, end))))
+            obj_file.write("\n")
+            first += len(points)
+
+
+def write_svg(reader, filename, size=1024, stroke_width=1.0):
+    """ Export the x, y plane of a stream as SVG polylines size pixels across
+        the larger dimension """
+    lower, upper = reader.bounds()
+    extent = max(float(upper[0] - lower[0]), float(upper[1] - lower[1])) or 1.0
+    scale = size / extent
+    width = (upper[0] - lower[0]) * scale
+    height = (upper[1] - lower[1]) * scale
+    with open(filename, 'w') as svg_file:
+        svg_file.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'width="%.2f" height="%.2f" viewBox="0 0 %.2f %.2f">\n' % (
+                width, height, width, height))
+        svg_file.write('<g fill="none" stroke="black" stroke-width="%g">\n'
+                       % stroke_width)
+        for points in reader:
+            svg_file.write('<polyline points="')
+            for start in range(0, len(points), CHUNK_POINTS):
+                chunk = points[start:start + CHUNK_POINTS]
+                x = (chunk[:, 0] - lower[0]) * scale
+                # SVG y runs down the page
+                y = (upper[1] - chunk[:, 1]) * scale
+                svg_file.write(" ".join(
+                    "%.2f,%.2f" % point for point in zip(x, y)) + " ")
+            svg_file.write('"/>\n')
+        svg_file.write('</g>\n</svg>\n')
@@ -0,0 +1,128 @@
+################################################################################
+#
+# Hot path profiling
+#
+# Instrument named functions of a module with timing wrappers gathering call
+# counts, cumulative time and a histogram of per-call times. Wrappers are only
+# installed while profiling so disabled functions run untouched.
+#
+#   with HotPath.Profiler() as profiler:
+#       profiler.instrument(CrushGraphics, CrushGraphics.HOT_PATHS)
+#       ...
+#   profiler.report(operator)
+#
+################################################################################
+import time
+
+from math import (
+    floor,
+    log10
+)
+
+
+# Per-call time histogram buckets, decades upwards from 1 microsecond
+HISTOGRAM_LABELS = ["<1us", "<10us", "<100us", "<1ms", "<10ms", "<100ms",
+                    "<1s", ">=1s"]
+
+
+def histogram_bucket(seconds):
+    """ Index into HISTOGRAM_LABELS for a call taking seconds """
+    if seconds < 1e-6:
+        return 0
+    bucket = int(floor(log10(seconds))) + 7
+    return min(bucket, len(HISTOGRAM_LABELS) - 1)
+
+
+class CallStats(object):
+    """ Timing statistics for one instrumented function """
+
+    def __init__(self, name):
+        """ Ctor """
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.histogram = [0] * len(HISTOGRAM_LABELS)
+
+    def record(self, seconds):
+        """ Add one call taking seconds """
+        self.count += 1
+        self.total += seconds
+        self.histogram[histogram_bucket(seconds)] += 1
+
+    def summary(self):
+        """ One line summary of the statistics """
+        per_call = self.total / self.count if self.count else 0.0
+        buckets = " ".join(
+            "%s:%d" % (label, count)
+            for label, count in zip(HISTOGRAM_LABELS, self.histogram) if count)
+        return "%s: %d calls %.4fs total %.6fs/call [%s]" % (
+            self.name, self.count, self.total, per_call, buckets)
+
+
+class Profiler(object):
+    """ Install timing wrappers on module functions and report on them. Used
+        as a context manager the original functions are restored on exit. """
+
+    def __init__(self):
+        """ Ctor """
+        self.stats = {}
+        self.patched = []
+
+    def __enter__(self):
+        """ Start profiling """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Stop profiling and restore the original functions """
+        self.restore()
+        return False
+
+    def instrument(self, module, names):
+        """ Replace each named function in module with a timed wrapper """
+        for name in names:
+            function = getattr(module, name)
+            label = "%s.%s" % (module.__name__, name)
+            self.patched.append((module, name, function))
+            setattr(module, name, self.wrap(label, function))
+
+    def restore(self):
+        """ Put back every instrumented function """
+        while self.patched:
+            module, name, function = self.patched.pop()
+            setattr(module, name, function)
+
+    def wrap(self, label, function):
+        """ Return function wrapped to record its call times under label """
+        stats = self.stats.setdefault(label, CallStats(label))
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.record(clock() - start)
+
+        timed.__name__ = function.__name__
+        timed.__doc__ = function.__doc__
+        return timed
+
+    def summary(self):
+        """ Summary lines ordered by total time, most expensive first """
+        ordered = sorted(self.stats.values(),
+                         key=lambda stats: stats.total, reverse=True)
+        return [stats.summary() for stats in ordered]
+
+    def report(self, operator=None):
+        """ Report the summary through a Blender operator or to the console """
+        for line in self.summary():
+            if operator:
+                operator.report({'INFO'}, "profile: %s" % line)
+            else:
+                print("profile: %s" % line)
+
+    def dump(self, filename):
+        """ Write the summary to a file """
+        with open(filename, 'w') as dump_file:
+            for line in self.summary():
+                dump_file.write(line + "\n")
@@ -0,0 +1,129 @@
+################################################################################
+#
+# Level of detail for L system geometry
+#
+# build_lod draws an L system at several iteration depths, and optionally
+# several simplification tolerances, in one pass where each depth is expanded
+# from the one before. Every variant is parented to a single LOD empty and
+# tagged with the size of its finest detail.
+#
+# Once registered a handler run after each frame change, when the camera has
+# been animated to the new frame, shows only one variant of each LOD empty:
+# the coarsest whose finest detail still projects to no more than lod_pixels
+# pixels from the scene camera. Distant fractals in wide shots then render
+# their cheapest variant.
+#
+################################################################################
+import bpy
+import CrushGraphics
+import SystemL
+
+from math import (
+    tan
+)
+from mathutils import (
+    Matrix
+)
+
+
+# Largest on screen size in pixels of detail that may be dropped
+LOD_PIXELS = 1.0
+
+
+def build_lod(name, spline_type, axiom, rules, depths, make_renderer,
+              feature_size, tolerances=(0.0,)):
+    """ Draw the L system given by axiom and rules at each of depths and
+        tolerances. make_renderer(turtle, depth) returns the symbol to
+        function dictionary for a turtle and feature_size(depth) the length
+        of the smallest detail at depth. Variants are grouped as name-depth,
+        with -tolerance appended when simplified, and parented to a new
+        name-LOD empty which is returned. """
+    origin = CrushGraphics.cursor_location()
+    lod = bpy.data.objects.new(name=name + "-LOD", object_data=None)
+    lod.empty_draw_type = 'PLAIN_AXES'
+    lod.location = origin
+    lod["lod_pixels"] = LOD_PIXELS
+    bpy.context.scene.objects.link(lod)
+    parent_inverse = Matrix.Translation(-origin)
+
+    wanted = set(depths)
+    for depth, lsystem in SystemL.systeml_compile_levels(axiom, rules,
+                                                         max(wanted)):
+        if depth not in wanted:
+            continue
+        for tolerance in tolerances:
+            group_name = "%s-%d" % (name, depth)
+            if tolerance > 0:
+                group_name = "%s-%g" % (group_name, tolerance)
+            turtle = CrushGraphics.Crush(group_name, spline_type)
+            turtle.tolerance = tolerance
+            turtle.pen_down()
+            SystemL.systeml_execute(lsystem, make_renderer(turtle, depth))
+            turtle.pen_up()
+            for variant in turtle.group.objects:
+                variant.parent = lod
+                variant.matrix_parent_inverse = parent_inverse
+                variant["lod_variant"] = group_name
+                variant["lod_detail"] = max(feature_size(depth), tolerance)
+
+    # evaluate matrix_world of the new empty before measuring from it
+    bpy.context.scene.update()
+    choose_variant(bpy.context.scene, lod)
+    return lod
+
+
+def pixel_size(scene, camera, location):
+    """ World space size of one rendered pixel at location seen from camera """
+    distance = (camera.matrix_world.translation - location).length
+    resolution = scene.render.resolution_x * \
+        scene.render.resolution_percentage / 100.0
+    if camera.data.type == 'ORTHO':
+        return camera.data.ortho_scale / resolution
+    return 2.0 * distance * tan(camera.data.angle / 2.0) / resolution
+
+
+def choose_variant(scene, lod):
+    """ Show only the variant of lod suited to its distance from the camera """
+    children = [child for child in lod.children if "lod_variant" in child]
+    if not children:
+        return
+    variants = sorted(set((child["lod_detail"], child["lod_variant"])
+                          for child in children))
+
+    chosen = variants[0]
+    camera = scene.camera
+    if camera is not None:
+        limit = lod["lod_pixels"] * \
+            pixel_size(scene, camera, lod.matrix_world.translation)
+        for variant in variants:
+            if variant[0] <= limit:
+                chosen = variant
+
+    for child in children:
+        hidden = child["lod_variant"] != chosen[1]
+        child.hide = hidden
+        child.hide_render = hidden
+
+
+@bpy.app.handlers.persistent
+def choose_variants(scene):
+    """ Frame change handler choosing variants for every LOD empty """
+    for lod in scene.objects:
+        if "lod_pixels" in lod:
+            choose_variant(scene, lod)
+
+
+def register():
+    """ Choose variants on every frame change """
+    if choose_variants not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(choose_variants)
+
+
+def unregister():
+    """ Stop choosing variants """
+    if choose_variants in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(choose_variants)
+
+
+if __name__ == '__main__':
+    register()
@@ -5,18 +5,32 @@
 # Blender Addon to trace a path object and place objects along the path for
 # example a set of dominos
 #
+# Placements along every spline of every selected curve are planned from
+# plain copies of the spline data, optionally in worker processes, then all
+# objects are created in one batch sharing a single new mesh.
+#
+# The interactive operator creates the planned objects in slices of a few
+# milliseconds on timer events, showing progress in the header, so large
+# walks can be watched and cancelled with Esc.
+#
 ################################################################################
 import bpy
+import concurrent.futures
+import sys
+import time
 
 from bpy.props import (
+    BoolProperty,
     EnumProperty,
     FloatVectorProperty,
     FloatProperty,
     IntProperty,
     StringProperty
 )
-from mathutils import (
-    Vector
+from math import (
+    atan2,
+    hypot,
+    sqrt
 )
 
 bl_info = \
@@ -34,121 +48,272 @@ bl_info = \
     }
 
 
+# Functions instrumented when profiling is enabled
+HOT_PATHS = ('spline_data', 'plan_spline', 'new_domino_mesh', 'draw_dominoes',
+             'add_physics', 'add_rigid_bodies')
+
+# Samples taken along each bezier segment or NURBS knot span
+SAMPLES_PER_SEGMENT = 16
+
+# Events passed on to the view while the interactive walk runs, anything else
+# such as undo or delete would act on objects still being placed
+NAVIGATION_EVENTS = {
+    'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'MOUSEMOVE',
+    'INBETWEEN_MOUSEMOVE', 'TRACKPADPAN', 'TRACKPADZOOM', 'NDOF_MOTION',
+    'NUMPAD_0', 'NUMPAD_1', 'NUMPAD_2', 'NUMPAD_3', 'NUMPAD_4', 'NUMPAD_5',
+    'NUMPAD_6', 'NUMPAD_7', 'NUMPAD_8', 'NUMPAD_9', 'NUMPAD_PERIOD',
+    'NUMPAD_PLUS', 'NUMPAD_MINUS'
+}
+
+
 def debug_path(operator, frame, location, rotation):
     """ Dump path info to console """
     operator.report({'INFO'},
                     "debug_path: %d %s %s" % (frame, location, rotation))
 
 
-def draw_domino(frame, location, euler_rotation, dimensions, mass, collision_margin,
-                friction, bounciness, group_name, material, simulation_type):
-    """ Draw a single domino named for given frame at location with rotation and
-        dimensions as supplied. Physics parameters may also be tweaked. """
-    location = location + Vector((0, 0, dimensions[2] / 2.0))
-    name = "Domino.%03d" % frame
-    if frame == 1:
-        bpy.ops.mesh.primitive_cube_add(location=location, rotation=euler_rotation)
-        cube = bpy.context.active_object
-        cube.name = name
-        cube.data.name = 'Domino-mesh'
-        if material:
-            cube.data.materials.append(material)
+def spline_data(curve, spline):
+    """ Copy a spline into plain tuples of world space data for plan_spline:
+        (type, points, weights, order, cyclic, endpoint). Bezier points are
+        (left handle, knot, right handle) triples. """
+    matrix = curve.matrix_world
+    if spline.type == 'BEZIER':
+        points = [(tuple(matrix * point.handle_left), tuple(matrix * point.co),
+                   tuple(matrix * point.handle_right))
+                  for point in spline.bezier_points]
+        weights = None
+    else:
+        points = [tuple(matrix * point.co.xyz) for point in spline.points]
+        weights = [point.co.w for point in spline.points]
+    return (spline.type, points, weights, spline.order_u, spline.use_cyclic_u,
+            spline.use_endpoint_u)
+
+
+def bezier_samples(points, cyclic):
+    """ Points along a bezier spline given (left, knot, right) triples """
+    if cyclic:
+        points = points + points[:1]
+    samples = [points[0][1]]
+    for (left0, knot0, right0), (left1, knot1, right1) in zip(points,
+                                                              points[1:]):
+        for sample in range(1, SAMPLES_PER_SEGMENT + 1):
+            t = sample / float(SAMPLES_PER_SEGMENT)
+            s = 1.0 - t
+            a, b, c, d = s * s * s, 3.0 * s * s * t, 3.0 * s * t * t, t * t * t
+            samples.append(tuple(
+                a * k0 + b * r0 + c * l1 + d * k1
+                for k0, r0, l1, k1 in zip(knot0, right0, left1, knot1)))
+    return samples
+
+
+def nurbs_knots(count, order, cyclic, endpoint):
+    """ Knot vector Blender uses for a NURBS spline of count points. Bezier
+        knots (use_bezier_u) are not supported and are planned as uniform
+        or endpoint knots. """
+    if cyclic or not endpoint:
+        return [float(knot) for knot in range(count + order)]
+    inner = count - order
+    return [0.0] * order + [float(knot) for knot in range(1, inner + 1)] + \
+        [float(inner + 1)] * order
+
+
+def nurbs_point(points, weights, order, knots, t):
+    """ Evaluate a rational B-spline at t with de Boor's algorithm """
+    span = order - 1
+    while span < len(points) - 1 and knots[span + 1] <= t:
+        span += 1
+    # homogeneous control points of the span
+    d = [[weights[j] * value for value in points[j]] + [weights[j]]
+         for j in range(span - order + 1, span + 1)]
+    for r in range(1, order):
+        for j in range(order - 1, r - 1, -1):
+            i = j + span - order + 1
+            denominator = knots[i + order - r] - knots[i]
+            alpha = (t - knots[i]) / denominator if denominator else 0.0
+            d[j] = [(1.0 - alpha) * a + alpha * b for a, b in zip(d[j - 1], d[j])]
+    w = d[order - 1][3] or 1.0
+    return tuple(value / w for value in d[order - 1][:3])
+
+
+def nurbs_samples(points, weights, order, cyclic, endpoint):
+    """ Points along a NURBS or POLY spline """
+    if len(points) < 2:
+        return []
+    order = max(2, min(order, len(points)))
+    if cyclic:
+        points = points + points[:order - 1]
+        weights = weights + weights[:order - 1]
+    knots = nurbs_knots(len(points), order, cyclic, endpoint)
+    start, end = knots[order - 1], knots[len(points)]
+    spans = len(points) - order + 1
+    count = spans * SAMPLES_PER_SEGMENT
+    return [nurbs_point(points, weights, order, knots,
+                        start + (end - start) * sample / float(count))
+            for sample in range(count + 1)]
+
+
+def track_rotation(direction):
+    """ Euler rotation pointing X along direction keeping Z up, as given by
+        Vector.to_track_quat('X', 'Z').to_euler() """
+    x, y, z = direction
+    return (0.0, -atan2(z, hypot(x, y)), atan2(y, x))
+
+
+def plan_spline(data, steps):
+    """ Place steps objects evenly along a spline described by spline_data
+        returning (location, rotation) tuples. Only the control points are
+        used, so unlike a curve path this ignores tilt, hooks, modifiers and
+        NURBS bezier knots. """
+    spline_type, points, weights, order, cyclic, endpoint = data
+    if spline_type == 'BEZIER':
+        samples = bezier_samples(points, cyclic)
+    elif spline_type == 'POLY':
+        samples = points + points[:1] if cyclic else points
     else:
-        cube = bpy.data.objects.new(name=name, object_data=bpy.data.meshes['Domino-mesh'])
-        cube.location = location
-        cube.rotation_euler = euler_rotation
-        bpy.context.scene.objects.link(cube)
-    bpy.data.groups[group_name].objects.link(cube)
-    cube.dimensions = dimensions
-    bpy.context.scene.objects.active = cube
+        samples = nurbs_samples(points, weights, order, cyclic, endpoint)
 
-    collision_shape = 'CONVEX_HULL'
+    lengths = [0.0]
+    for previous, sample in zip(samples, samples[1:]):
+        lengths.append(lengths[-1] + sqrt(sum(
+            (b - a) * (b - a) for a, b in zip(previous, sample))))
+    if len(samples) < 2 or lengths[-1] == 0.0:
+        return []
 
-    if simulation_type == 'GameEngine':
-        physics_object = cube.game
-        physics_object.physics_type = 'RIGID_BODY'
-        physics_object.use_collision_bounds = True
-        physics_object.collision_bounds_type = collision_shape
-        physics_object.use_anisotropic_friction = True
-        physics_object.friction_coefficients = \
-            physics_object.friction_coefficients * friction
-    else:
-        bpy.ops.rigidbody.object_add()
-        physics_object = cube.rigid_body
-        physics_object.type = 'ACTIVE'
-        physics_object.enabled = True
-        physics_object.collision_shape = collision_shape
-        physics_object.friction = friction
-        physics_object.use_deactivation = True
-        physics_object.use_start_deactivated = False
-        physics_object.deactivate_linear_velocity = 1.0
-        physics_object.deactivate_angular_velocity = 1.0
-
-    physics_object.mass = mass
-    physics_object.use_margin = True
-    physics_object.collision_margin = collision_margin
-    physics_object.restitution = bounciness
-
-
-def set_frame(curve, frame):
-    """ Set eval_time on curve and update dependent variables """
-    curve.data.eval_time = float(frame)
-    bpy.context.scene.update()
-
-
-def walk_curve(operator, curve, steps, walk_function):
-    """ Walk a curve - this is slow as number of 
-        points gets above around a few hundred"""
-    curve_data = curve.data
-    eval_time = curve_data.eval_time
-    active_object = bpy.context.scene.objects.active
-
-    set_frame(curve, 1)
-    curve_type = curve_data.splines[0].type
-    if curve_type == 'NURBS':
-        location = curve.location + curve_data.splines[0].points[0].co.xyz
-    elif curve_type == 'BEZIER':
-        location = curve.location + curve_data.splines[0].bezier_points[0].co.xyz
-
-    empty_object = bpy.data.objects.new(name="Empty", object_data=None)
-    empty_object.empty_draw_type = 'ARROWS'
-    bpy.context.scene.objects.link(empty_object)
-
-    constraint = empty_object.constraints.new(type='FOLLOW_PATH')
-    constraint.target = curve
-    curve_data.use_path = True
-    animation = curve_data.animation_data_create()
-    animation.action = bpy.data.actions.new("%sAction" % curve_data.name)
-    f_curve = animation.action.fcurves.new("eval_time")
-    modifier = f_curve.modifiers.new('GENERATOR')
-    modifier.coefficients = (-1, 1)
-
-    set_frame(curve, 2)
-    previous_location = Vector(empty_object.matrix_world.translation)
-    set_frame(curve, 1)
-    location = empty_object.matrix_world.translation
-    direction = location - previous_location
-    previous_location = location + direction
-
-    step_to_frame = curve_data.path_duration / float(steps)
+    placements = []
+    segment = 0
     for step in range(1, int(steps) + 1):
-        frame = step * step_to_frame
-        set_frame(curve, frame)
-        direction = location - previous_location
-        rot_quat = direction.to_track_quat('X', 'Z')
-        rotation = rot_quat.to_euler()
-        walk_function(step, location, rotation)
-        previous_location = Vector(location)
+        distance = lengths[-1] * step / float(steps)
+        while segment < len(lengths) - 2 and lengths[segment + 1] < distance:
+            segment += 1
+        start, end = samples[segment], samples[segment + 1]
+        span = lengths[segment + 1] - lengths[segment]
+        fraction = (distance - lengths[segment]) / span if span else 0.0
+        direction = tuple(b - a for a, b in zip(start, end))
+        location = tuple(a + (b - a) * fraction for a, b in zip(start, end))
+        placements.append((location, track_rotation(direction)))
+    return placements
+
+
+def walk_curve(curve, steps, map_function=map):
+    """ Plan steps placements along every spline of a curve returning a list
+        of placements for each spline. map_function applies plan_spline to
+        the spline data, for example the map of a process pool. """
+    datas = [spline_data(curve, spline) for spline in curve.data.splines]
+    return list(map_function(plan_spline, datas, [steps] * len(datas)))
+
+
+def new_domino_mesh(dimensions, material):
+    """ Create a box mesh with given dimensions centred on the origin. The
+        mesh is shared by all dominoes of a walk. """
+    x, y, z = (dimension / 2.0 for dimension in dimensions)
+    vertices = [(-x, -y, -z), (-x, y, -z), (x, y, -z), (x, -y, -z),
+                (-x, -y, z), (-x, y, z), (x, y, z), (x, -y, z)]
+    faces = [(0, 1, 2, 3), (7, 6, 5, 4), (0, 4, 5, 1),
+             (1, 5, 6, 2), (2, 6, 7, 3), (3, 7, 4, 0)]
+    mesh = bpy.data.meshes.new('Domino-mesh')
+    mesh.from_pydata(vertices, [], faces)
+    # like primitive_cube_add give the mesh a UV map, each face showing the
+    # whole image
+    mesh.uv_textures.new()
+    mesh.uv_layers.active.data.foreach_set(
+        'uv', [0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0] * len(faces))
+    mesh.update()
+    if material:
+        mesh.materials.append(material)
+    return mesh
+
+
+def domino_jobs(curve, splines, group):
+    """ Yield (name, group, location, rotation) for every placement of every
+        spline of curve, dominoes are named <curve>.Domino.<spline>.<step> """
+    for spline_index, placements in enumerate(splines):
+        for step, (location, rotation) in enumerate(placements, 1):
+            name = "%s.Domino.%d.%03d" % (curve.name, spline_index, step)
+            yield name, group, location, rotation
+
+
+def draw_dominoes(jobs, mesh, lift):
+    """ Create a domino for each job from domino_jobs raised lift above the
+        path. Returns the new objects. """
+    link = bpy.context.scene.objects.link
+    dominoes = []
+    for name, group, location, rotation in jobs:
+        domino = bpy.data.objects.new(name=name, object_data=mesh)
+        domino.location = (location[0], location[1], location[2] + lift)
+        domino.rotation_euler = rotation
+        link(domino)
+        group.objects.link(domino)
+        dominoes.append(domino)
+    return dominoes
+
+
+def add_rigid_bodies(dominoes):
+    """ Add rigid body physics to all dominoes with one operator call """
+    scene = bpy.context.scene
+    for obj in bpy.context.selected_objects:
+        obj.select = False
+    for domino in dominoes:
+        domino.select = True
+    scene.objects.active = dominoes[0]
+    bpy.ops.rigidbody.objects_add(type='ACTIVE')
+    for domino in dominoes:
+        domino.select = False
+
+
+def add_physics(dominoes, mass, collision_margin, friction, bounciness,
+                simulation_type):
+    """ Set up physics for dominoes. Physics parameters may be tweaked. """
+    if not dominoes:
+        return
 
-    bpy.data.objects.remove(empty_object, do_unlink=True)
+    collision_shape = 'CONVEX_HULL'
 
-    bpy.context.scene.objects.active = active_object
-    active_object.select = True
-    set_frame(curve, eval_time)
+    if simulation_type != 'GameEngine':
+        add_rigid_bodies(dominoes)
+
+    for domino in dominoes:
+        if simulation_type == 'GameEngine':
+            physics_object = domino.game
+            physics_object.physics_type = 'RIGID_BODY'
+            physics_object.use_collision_bounds = True
+            physics_object.collision_bounds_type = collision_shape
+            physics_object.use_anisotropic_friction = True
+            physics_object.friction_coefficients = \
+                physics_object.friction_coefficients * friction
+        else:
+            physics_object = domino.rigid_body
+            physics_object.type = 'ACTIVE'
+            physics_object.enabled = True
+            physics_object.collision_shape = collision_shape
+            physics_object.friction = friction
+            physics_object.use_deactivation = True
+            physics_object.use_start_deactivated = False
+            physics_object.deactivate_linear_velocity = 1.0
+            physics_object.deactivate_angular_velocity = 1.0
+
+        physics_object.mass = mass
+        physics_object.use_margin = True
+        physics_object.collision_margin = collision_margin
+        physics_object.restitution = bounciness
+
+
+def selected_curves(context):
+    """ Selected curve objects, the active object first if it is one """
+    curves = [obj for obj in context.selected_objects
+              if isinstance(obj.data, bpy.types.Curve)]
+    active_object = context.active_object
+    if active_object in curves:
+        curves.remove(active_object)
+        curves.insert(0, active_object)
+    elif active_object is not None and \
+            isinstance(active_object.data, bpy.types.Curve):
+        curves.insert(0, active_object)
+    return curves
 
 
 class PathWalker(bpy.types.Operator):
-    """ Operator walks a path placing new objects along the path as it goes """
+    """ Operator walks every spline of the selected curves placing new
+        objects along them """
 
     bl_idname = 'object.path_walker'
 
@@ -206,7 +371,7 @@ class PathWalker(bpy.types.Operator):
 
     number = IntProperty(
         name="number",
-        description="The number of objects to place on the path",
+        description="The number of objects to place on each spline",
         default=5,
         min=1,
         max=10000
@@ -219,56 +384,281 @@ class PathWalker(bpy.types.Operator):
         default='GameEngine'
     )
 
+    parallel = BoolProperty(
+        name="parallel",
+        description="Plan splines in worker processes, worth it for many "
+                    "long splines",
+        default=False
+    )
+
+    profile = BoolProperty(
+        name="profile",
+        description="Report time spent in the hot paths",
+        default=False
+    )
+
+    profile_file = StringProperty(
+        name="profile file",
+        description="File to dump the profile summary to",
+        default="",
+        subtype='FILE_PATH'
+    )
+
     @classmethod
     def poll(cls, context):
         """ Blender poll method """
         active_object = context.active_object
-        return active_object is not None and active_object.mode == 'OBJECT' and \
-            isinstance(active_object.data, bpy.types.Curve)
+        return (active_object is None or active_object.mode == 'OBJECT') and \
+            len(selected_curves(context)) > 0
+
+    def material(self):
+        """ The material to assign each object or None """
+        if len(self.material_name) > 0:
+            if bpy.data.materials.find(self.material_name) != -1:
+                return bpy.data.materials[self.material_name]
+        return None
+
+    def plan(self, context):
+        """ Plan placements along every selected curve returning the curves,
+            the domino jobs and any groups that had to be created """
+        if self.parallel:
+            try:
+                with concurrent.futures.ProcessPoolExecutor() as executor:
+                    return self.plan_with(context, executor.map)
+            except (OSError, concurrent.futures.process.BrokenProcessPool) \
+                    as error:
+                self.report({'WARNING'}, "PathWalker: planning without "
+                            "worker processes, %s" % error)
+        return self.plan_with(context, map)
+
+    def plan_with(self, context, map_function):
+        """ plan() applying plan_spline to the splines with map_function """
+        curves = selected_curves(context)
+        # plan everything before creating groups so a failed plan leaves none
+        plans = [walk_curve(curve, self.number, map_function)
+                 for curve in curves]
+        jobs = []
+        new_groups = []
+        for curve, splines in zip(curves, plans):
+            group_name = curve.name + 'PathWalkerGroup'
+            if bpy.data.groups.find(group_name) == -1:
+                new_groups.append(bpy.data.groups.new(name=group_name))
+            jobs.extend(domino_jobs(curve, splines,
+                                    bpy.data.groups[group_name]))
+        return curves, jobs, new_groups
+
+    def create(self, jobs, mesh):
+        """ Create dominoes with physics for jobs """
+        dominoes = draw_dominoes(jobs, mesh, self.dimensions[2] / 2.0)
+        add_physics(dominoes, mass=self.mass,
+                    collision_margin=self.collision_margin,
+                    friction=self.friction, bounciness=self.bounciness,
+                    simulation_type=self.simulation_type)
+        return dominoes
+
+    def walk(self, context):
+        """ Plan placements along every selected curve then create all the
+            dominoes in one batch """
+        active_object = context.active_object
+        curves, jobs, _ = self.plan(context)
+        dominoes = self.create(jobs,
+                               new_domino_mesh(self.dimensions, self.material()))
+
+        for curve in curves:
+            curve.select = True
+        context.scene.objects.active = active_object
+        return dominoes
+
+    def start_profile(self):
+        """ A profiler timing the hot paths or None when not profiling """
+        if not self.profile:
+            return None
+        # only loaded when profiling so the HotPath text is optional
+        import HotPath
+        profiler = HotPath.Profiler()
+        profiler.instrument(sys.modules[__name__], HOT_PATHS)
+        return profiler
+
+    def end_profile(self, profiler):
+        """ Restore the hot paths and report the time spent in them """
+        if profiler is None:
+            return
+        profiler.restore()
+        profiler.report(self)
+        if len(self.profile_file) > 0:
+            profiler.dump(bpy.path.abspath(self.profile_file))
 
     def execute(self, context):
         """ Blender operator execute method """
-        active_object = context.active_object
-        context.object.select = False
+        profiler = self.start_profile()
+        try:
+            self.walk(context)
+        finally:
+            self.end_profile(profiler)
+        return {'FINISHED'}
 
-        group_name = active_object.name + 'PathWalkerGroup'
-        if bpy.data.groups.find(group_name) == -1:
-            bpy.data.groups.new(name=group_name)
 
-        material = None
-        if len(self.material_name) > 0:
-            if bpy.data.materials.find(self.material_name) != -1:
-                material = bpy.data.materials[self.material_name]
-
-        def create_domino(frame, location, rotation):
-            """ for use with walk_curve to draw a domino """
-            #debug_path(self, frame, location, rotation)
-            draw_domino(frame, location, rotation,
-                        dimensions=self.dimensions, mass=self.mass,
-                        collision_margin=self.collision_margin,
-                        friction=self.friction, bounciness=self.bounciness,
-                        group_name=group_name, material=material,
-                        simulation_type=self.simulation_type)
-
-        walk_curve(self, active_object, self.number, create_domino)
-        return {'FINISHED'}
+class PathWalkerModal(PathWalker):
+    """ Operator placing objects along the selected curves in time limited
+        slices so the interface stays responsive. Esc cancels, either removing
+        the objects placed so far or keeping them. Only view navigation
+        reaches the view meanwhile so everything placed is a single undo
+        step. There is no redo panel, redoing would run the blocking
+        execute() inherited for scripts. """
+
+    bl_idname = 'object.path_walker_modal'
+
+    bl_label = 'PathWalker (interactive)'
+
+    bl_options = {'UNDO'}
+
+    bl_description = "Interactive path walking tool"
+
+    budget = FloatProperty(
+        name="budget",
+        description="Milliseconds spent placing objects per timer tick",
+        default=16.0,
+        min=1.0,
+        subtype='NONE',
+        unit='NONE'
+    )
+
+    keep_partial = BoolProperty(
+        name="keep partial",
+        description="Keep the objects placed so far when cancelled",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        """ Plan the walk and start placing on timer events """
+        self.active_object = context.active_object
+        self.profiler = self.start_profile()
+        try:
+            self.curves, self.jobs, self.new_groups = self.plan(context)
+        except Exception:
+            self.end_profile(self.profiler)
+            raise
+        if not self.jobs:
+            self.remove_groups()
+            self.end_profile(self.profiler)
+            return {'CANCELLED'}
+        self.mesh = new_domino_mesh(self.dimensions, self.material())
+        self.dominoes = []
+        self.started = time.perf_counter()
+        # seconds spent creating objects, to estimate the cost of each one
+        self.create_seconds = 0.0
+
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, len(self.jobs))
+        self.timer = window_manager.event_timer_add(0.001, context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        """ Place objects until the budget for this tick is spent """
+        if event.type == 'ESC':
+            return self.cancel_walk(context)
+        if event.type in NAVIGATION_EVENTS:
+            return {'PASS_THROUGH'}
+        if event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + self.budget / 1000.0
+        placed = len(self.dominoes)
+        while len(self.dominoes) < len(self.jobs):
+            done = len(self.dominoes)
+            # as many objects as the time left allows at the cost so far
+            size = 1
+            if self.create_seconds > 0:
+                size = int((deadline - time.perf_counter()) * done /
+                           self.create_seconds)
+            if size < 1:
+                if done > placed:
+                    break
+                size = 1
+            started = time.perf_counter()
+            self.dominoes.extend(self.create(self.jobs[done:done + size],
+                                             self.mesh))
+            self.create_seconds += time.perf_counter() - started
+
+        done = len(self.dominoes)
+        context.window_manager.progress_update(done)
+        if done == len(self.jobs):
+            self.finish(context)
+            return {'FINISHED'}
+
+        elapsed = time.perf_counter() - self.started
+        eta = elapsed / done * (len(self.jobs) - done) if done else 0.0
+        self.header(context, "PathWalker: %d/%d placed, %ds left - Esc to "
+                    "cancel" % (done, len(self.jobs), int(eta + 0.5)))
+        return {'RUNNING_MODAL'}
+
+    def header(self, context, text=None):
+        """ Show text in or clear the header of the area we were run from """
+        if context.area:
+            if text:
+                context.area.header_text_set(text)
+            else:
+                context.area.header_text_set()
+
+    def cancel_walk(self, context):
+        """ Stop placing keeping or removing the objects placed so far """
+        if self.keep_partial:
+            self.finish(context)
+            self.report({'INFO'}, "PathWalker: kept %d of %d" % (
+                len(self.dominoes), len(self.jobs)))
+            return {'FINISHED'}
+
+        for domino in self.dominoes:
+            bpy.data.objects.remove(domino, do_unlink=True)
+        if self.mesh.users == 0:
+            bpy.data.meshes.remove(self.mesh)
+        self.remove_groups()
+        self.finish(context)
+        return {'CANCELLED'}
+
+    def cancel(self, context):
+        """ Blender ended the walk, on loading a file or closing the window """
+        self.cancel_walk(context)
+
+    def remove_groups(self):
+        """ Remove groups created for this walk that are still empty """
+        for group in self.new_groups:
+            if len(group.objects) == 0:
+                bpy.data.groups.remove(group)
+
+    def finish(self, context):
+        """ Stop the timer and profiling and restore the interface and
+            selection """
+        self.end_profile(self.profiler)
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        self.header(context)
+        for curve in self.curves:
+            curve.select = True
+        context.scene.objects.active = self.active_object
 
 
 def menu_func(self, context):
     """ Add an operator control to a menu """
     self.layout.operator(PathWalker.bl_idname, text='Path Walker',
                          icon='PLUGIN')
+    self.layout.operator(PathWalkerModal.bl_idname,
+                         text='Path Walker (interactive)', icon='PLUGIN')
 
 
 def register():
     """ Register Blender Operator """
     bpy.utils.register_class(PathWalker)
+    bpy.utils.register_class(PathWalkerModal)
     bpy.types.VIEW3D_MT_object.append(menu_func)
 
 
 def unregister():
     """ Unregister Blender Operator """
     bpy.types.VIEW3D_MT_object.remove(menu_func)
+    bpy.utils.unregister_class(PathWalkerModal)
     bpy.utils.unregister_class(PathWalker)
 
 
@@ -6,6 +6,9 @@
 import CrushGraphics
 import SystemL
 
+# Set to profile the CrushGraphics hot paths, needs the HotPath text
+PROFILE = False
+
 
 def render_dragon(spline_type):
     """ Render the dragon l-system """
@@ -13,8 +16,8 @@ def render_dragon(spline_type):
         "F": lambda: turtle.forward(2),
         "+": lambda: turtle.turn(CrushGraphics.PI_BY_TWO),
         "-": lambda: turtle.turn(-CrushGraphics.PI_BY_TWO),
-        "X": lambda: None,
-        "Y": lambda: None,
+        "X": None,
+        "Y": None,
     }
 
     dragon = SystemL.systeml_dragon_curve(5)
@@ -26,23 +29,33 @@ def render_dragon(spline_type):
 
 
 def render_koch_snowflake(spline_type):
-    """ render a Koch snowflake curve """
-    snowflake_renderer = {
-        "F": lambda: turtle.forward(1.0 / pow(3, iterations)),
-        "+": lambda: turtle.turn(CrushGraphics.PI_BY_THREE),
-        "-": lambda: turtle.turn(-CrushGraphics.PI_BY_THREE)
-    }
-
-    for iterations in range(0, 5):
-        snowflake = SystemL.systeml_koch_snowflake(iterations)
-
-        turtle = CrushGraphics.Crush(
-            "KochSnowflake%s-%d" % (spline_type, iterations),
-            spline_type)
-        turtle.pen_down()
-        SystemL.systeml_execute(snowflake, snowflake_renderer)
-        turtle.pen_up()
+    """ render a Koch snowflake curve at each level of detail, showing the
+        level suited to the camera on every frame """
+    # only loaded here so the LevelOfDetail text is optional
+    import LevelOfDetail
+
+    def snowflake_renderer(turtle, iterations):
+        """ Symbol to function dictionary drawing iterations with turtle """
+        return {
+            "F": lambda: turtle.forward(1.0 / pow(3, iterations)),
+            "+": lambda: turtle.turn(CrushGraphics.PI_BY_THREE),
+            "-": lambda: turtle.turn(-CrushGraphics.PI_BY_THREE)
+        }
+
+    LevelOfDetail.register()
+    return LevelOfDetail.build_lod(
+        "KochSnowflake%s" % spline_type, spline_type,
+        SystemL.KOCH_SNOWFLAKE_AXIOM, SystemL.KOCH_SNOWFLAKE_RULES,
+        range(0, 5), snowflake_renderer,
+        lambda iterations: 1.0 / pow(3, iterations))
 
 
 if __name__ == '__main__':
-    render_koch_snowflake('BEZIER')
+    if PROFILE:
+        import HotPath
+        with HotPath.Profiler() as profiler:
+            profiler.instrument(CrushGraphics, CrushGraphics.HOT_PATHS)
+            render_koch_snowflake('BEZIER')
+        profiler.report()
+    else:
+        render_koch_snowflake('BEZIER')
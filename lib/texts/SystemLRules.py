@@ -0,0 +1,281 @@
+################################################################################
+#
+# Stochastic and context sensitive L systems
+#
+# Rule sets are compiled into lookup tables over numpy arrays of byte
+# symbols. Each generation picks a production for every symbol and expands
+# them all at once with a gather from the concatenated successors.
+#
+# A rule key is a single symbol "B" or a symbol with context: "A<B" replaces
+# B only when preceded by A, "B>C" only when followed by C and "A<B>C" when
+# both. A rule value is a successor string or a list of (weight, successor)
+# pairs, one of which is chosen at random in proportion to its weight.
+# Context rules take precedence over context free rules and earlier context
+# rules over later ones.
+#
+# Context follows the branching structure of bracketed strings: the left
+# context of a symbol is the symbol before it on its axis, or the symbol the
+# branch grows from at the start of a branch, and the right context is the
+# next symbol on the same axis with any branches in between skipped. So in
+# A[B]C both B and C have left context A and the right context of A is C.
+# Finding context in bracketed strings is a Python loop over every symbol.
+#
+# Rule sets that are neither stochastic nor context sensitive are applied
+# with str.translate until the string is long enough for the tables to pay
+# for building them.
+#
+# Random choices come from a numpy RandomState so a seed gives the same
+# string every time.
+#
+################################################################################
+import numpy
+
+
+# Symbols are single bytes
+SYMBOL_COUNT = 256
+
+# Start and end of a branch
+BRANCH_OPEN = ord('[')
+BRANCH_CLOSE = ord(']')
+
+# Context of a symbol with no neighbour
+NO_CONTEXT = -1
+
+# Length from which plain rules are faster applied with the tables
+TRANSLATE_MAX_LENGTH = 4096
+
+
+def symbol_code(symbol):
+    """ Byte value of a single character symbol """
+    if len(symbol) != 1 or ord(symbol) >= SYMBOL_COUNT:
+        raise ValueError("L system symbols must be single byte characters: %r"
+                         % symbol)
+    return ord(symbol)
+
+
+def context(symbols):
+    """ Arrays of the left and right context symbol of every symbol, or
+        NO_CONTEXT where there is none """
+    if not numpy.any((symbols == BRANCH_OPEN) | (symbols == BRANCH_CLOSE)):
+        left = numpy.full(len(symbols), NO_CONTEXT, dtype=numpy.intp)
+        right = numpy.full(len(symbols), NO_CONTEXT, dtype=numpy.intp)
+        left[1:] = symbols[:-1]
+        right[:-1] = symbols[1:]
+        return left, right
+
+    codes = symbols.tolist()
+    left = [NO_CONTEXT] * len(codes)
+    right = [NO_CONTEXT] * len(codes)
+    branches = []
+    previous = None
+    branch_start = False
+    for index, code in enumerate(codes):
+        if code == BRANCH_OPEN:
+            branches.append((previous, branch_start))
+            branch_start = True
+        elif code == BRANCH_CLOSE:
+            previous, branch_start = branches.pop() if branches else \
+                (None, False)
+        else:
+            if previous is not None:
+                left[index] = codes[previous]
+                if not branch_start:
+                    right[previous] = code
+            previous = index
+            branch_start = False
+    return (numpy.array(left, dtype=numpy.intp),
+            numpy.array(right, dtype=numpy.intp))
+
+
+def parse_key(key):
+    """ Split a rule key into (left, symbol, right), missing context is None """
+    left = right = None
+    if '<' in key:
+        left, key = key.split('<', 1)
+        left = symbol_code(left)
+    if '>' in key:
+        key, right = key.split('>', 1)
+        right = symbol_code(right)
+    return left, symbol_code(key), right
+
+
+class Rule(object):
+    """ A stochastic or context sensitive rule """
+
+    def __init__(self, left, symbol, right, production_ids, weights):
+        """ Ctor """
+        self.left = left
+        self.symbol = symbol
+        self.right = right
+        self.production_ids = numpy.array(production_ids, dtype=numpy.intp)
+        cumulative = numpy.cumsum(numpy.array(weights, dtype=numpy.float64))
+        if not cumulative[-1] > 0:
+            raise ValueError("Rule weights must have a positive total: %r"
+                             % (weights,))
+        self.cumulative = cumulative / cumulative[-1]
+
+    def matches(self, symbols, left, right):
+        """ Boolean mask of positions in symbols this rule applies to given
+            the left and right context of each symbol """
+        mask = symbols == self.symbol
+        if self.left is not None:
+            mask &= left == self.left
+        if self.right is not None:
+            mask &= right == self.right
+        return mask
+
+    def choose(self, count, random_state):
+        """ Production ids for count matching symbols """
+        if len(self.production_ids) == 1:
+            return self.production_ids[0]
+        choices = numpy.searchsorted(
+            self.cumulative, random_state.random_sample(count), side='right')
+        return self.production_ids[numpy.minimum(choices,
+                                                 len(self.production_ids) - 1)]
+
+
+class RuleSet(object):
+    """ Rules compiled into production tables """
+
+    def __init__(self, rules):
+        """ Compile a dictionary of rules """
+        # Productions 0-255 leave a symbol unchanged unless a deterministic
+        # context free rule replaces it.
+        successors = [chr(code) for code in range(SYMBOL_COUNT)]
+        self.rules = []
+        context_rules = []
+
+        for key, value in rules.items():
+            left, symbol, right = parse_key(key)
+            if isinstance(value, str):
+                value = [(1.0, value)]
+            if left is None and right is None and len(value) == 1:
+                successors[symbol] = value[0][1]
+                continue
+            production_ids = []
+            for weight, successor in value:
+                production_ids.append(len(successors))
+                successors.append(successor)
+            rule = Rule(left, symbol, right, production_ids,
+                        [weight for weight, successor in value])
+            if left is None and right is None:
+                self.rules.append(rule)
+            else:
+                context_rules.append(rule)
+
+        # applied in order so later rules override earlier ones
+        self.rules.extend(reversed(context_rules))
+        self.context_sensitive = len(context_rules) > 0
+        self.stochastic = any(len(rule.production_ids) > 1
+                              for rule in self.rules)
+
+        for successor in successors:
+            for symbol in successor:
+                symbol_code(symbol)
+        self.flat = numpy.frombuffer(
+            "".join(successors).encode('latin-1'), dtype=numpy.uint8)
+        self.lengths = numpy.array([len(successor) for successor in successors],
+                                   dtype=numpy.intp)
+        self.starts = numpy.cumsum(self.lengths) - self.lengths
+        self.base = numpy.arange(SYMBOL_COUNT, dtype=numpy.intp)
+
+    def expand(self, symbols, random_state):
+        """ Apply one generation of rules to an array of symbols """
+        production = self.base[symbols]
+        left = right = None
+        if self.context_sensitive:
+            left, right = context(symbols)
+        for rule in self.rules:
+            mask = rule.matches(symbols, left, right)
+            count = numpy.count_nonzero(mask)
+            if count:
+                production[mask] = rule.choose(count, random_state)
+
+        lengths = self.lengths[production]
+        ends = numpy.cumsum(lengths)
+        if len(ends) == 0 or ends[-1] == 0:
+            return numpy.zeros(0, dtype=numpy.uint8)
+        # output position i takes flat[start of its production + i - offset]
+        shift = numpy.repeat(self.starts[production] - (ends - lengths), lengths)
+        shift += numpy.arange(ends[-1], dtype=numpy.intp)
+        return self.flat[shift]
+
+
+def systeml_compile_rules(axiom, rules, iterations, seed=None):
+    """ Use stochastic and context sensitive rules to replace axiom set number
+        of iterations. The same seed always gives the same result. """
+    if all(len(key) == 1 and isinstance(value, str)
+           for key, value in rules.items()):
+        table = str.maketrans(rules)
+        while iterations > 0 and len(axiom) < TRANSLATE_MAX_LENGTH:
+            axiom = axiom.translate(table)
+            iterations -= 1
+        if iterations == 0:
+            return axiom
+    rule_set = RuleSet(rules)
+    random_state = None
+    if rule_set.stochastic:
+        random_state = numpy.random.RandomState(seed)
+    symbols = numpy.frombuffer(axiom.encode('latin-1'), dtype=numpy.uint8)
+    for iteration in range(0, iterations):
+        symbols = rule_set.expand(symbols, random_state)
+    return symbols.tobytes().decode('latin-1')
+
+
+def systeml_algae_stochastic(iterations, seed=None):
+    """ Algae where A only sometimes grows a new B """
+    return systeml_compile_rules(
+        "A",
+        {
+            "A": [(0.7, "AB"), (0.3, "A")],
+            "B": "A"
+        },
+        iterations,
+        seed)
+
+
+def systeml_algae_signal(iterations):
+    """ A signal B passed along a filament of algae cells A """
+    return systeml_compile_rules(
+        "BAAAAAAAAAAAAAAA",
+        {
+            "B<A": "B",
+            "B": "A"
+        },
+        iterations)
+
+
+def systeml_tree_signal(iterations):
+    """ A signal B passed from the trunk into every branch of a tree """
+    return systeml_compile_rules(
+        "B[A[A]A]A[A]A",
+        {
+            "B<A": "B",
+            "B": "A"
+        },
+        iterations)
+
+
+def systeml_pythagoras_tree_stochastic(iterations, seed=None):
+    """ A pythagorean tree with randomly missing branches and stunted trunks """
+    return systeml_compile_rules(
+        "0",
+        {
+            "0": [(2.0, "1[0]0"), (1.0, "1[0]"), (1.0, "10")],
+            "1": [(3.0, "11"), (1.0, "1")]
+        },
+        iterations,
+        seed)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    n = 100
+    for name in ('systeml_compile', 'systeml_compile_rules'):
+        t = timeit.timeit(
+            "%s('FX', {'X': 'X+YF+', 'Y': '-FX-Y'}, 15)" % name,
+            setup="from SystemL import systeml_compile\n"
+                  "from __main__ import systeml_compile_rules",
+            number=n)
+        print("%s single run %.4fs" % (name, t / n))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+#
+# Per-frame render telemetry
+#
+# Stream the output of a Blender --render-anim process, echo it through and
+# extract per-frame render time, peak memory and the saved filename. Running
+# percentiles, an ETA and frames that take much longer than their neighbours
+# are reported as each frame completes.
+#
+# Run a render:
+#   telemetry.py --frame-end 1152 -- blender --background x.blend --render-anim
+#
+# Replay a recorded log:
+#   telemetry.py --log render.log
+#
+import argparse
+import bisect
+import re
+import subprocess
+import sys
+
+# Fra:12 Mem:139.95M (0.00M, Peak 141.03M) | Time:00:03.18 | ...
+FRAME_PATTERN = re.compile(r'^Fra:(\d+)\s+Mem:([\d.]+)([KMG])')
+PEAK_PATTERN = re.compile(r'Peak ([\d.]+)([KMG])')
+
+# Saved: 'cache_render/TheFall0012.png'
+# Saved: 'cache_render/TheFall0012.png' Time: 00:03.57 (Saving: 00:00.38)
+SAVED_PATTERN = re.compile(
+    r"^Saved: '?(.*?)'?(?:\s+Time: ([\d:.]+).*)?\s*$")
+
+#  Time: 00:03.57 (Saving: 00:00.38)
+TIME_PATTERN = re.compile(r'^\s*Time: ([\d:.]+)')
+
+UNIT_TO_MB = {'K': 1.0 / 1024.0, 'M': 1.0, 'G': 1024.0}
+
+
+def parse_time(text):
+    """ Convert a Blender [[HH:]MM:]SS.ss time stamp to seconds """
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60.0 + float(part)
+    return seconds
+
+
+def format_time(seconds):
+    """ Format seconds as HH:MM:SS """
+    seconds = int(round(seconds))
+    return "%02d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def percentile(ordered, fraction):
+    """ Nearest rank percentile of an already sorted list """
+    if not ordered:
+        return 0.0
+    index = int(round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Frame(object):
+    """ Telemetry for one rendered frame """
+
+    def __init__(self, number):
+        """ Ctor """
+        self.number = number
+        self.seconds = 0.0
+        self.peak_mb = 0.0
+        self.filename = None
+        self.spike = False
+
+
+class RenderTelemetry(object):
+    """ Accumulate per-frame statistics from Blender render output fed in one
+        line at a time. Completed frames are passed to on_frame. """
+
+    def __init__(self, frame_end=None, window=9, spike_factor=2.0,
+                 on_frame=None):
+        """ window frames before each frame are used as its neighbours, a frame
+            taking spike_factor times their median is flagged as a spike """
+        self.frame_end = frame_end
+        self.window = window
+        self.spike_factor = spike_factor
+        self.on_frame = on_frame
+        self.frames = []
+        self.ordered_seconds = []
+        self.current = None
+
+    def feed(self, line):
+        """ Parse a single line of render output """
+        match = FRAME_PATTERN.match(line)
+        if match:
+            number = int(match.group(1))
+            if self.current is None or self.current.number != number:
+                self.current = Frame(number)
+            memory = float(match.group(2)) * UNIT_TO_MB[match.group(3)]
+            peak = PEAK_PATTERN.search(line)
+            if peak:
+                memory = max(memory,
+                             float(peak.group(1)) * UNIT_TO_MB[peak.group(2)])
+            self.current.peak_mb = max(self.current.peak_mb, memory)
+            return
+
+        if self.current is None:
+            return
+
+        match = SAVED_PATTERN.match(line)
+        if match:
+            self.current.filename = match.group(1)
+            # 2.7x prints the render time on the same line
+            if match.group(2):
+                self.finish(parse_time(match.group(2)))
+            return
+
+        match = TIME_PATTERN.match(line)
+        if match:
+            self.finish(parse_time(match.group(1)))
+
+    def finish(self, seconds):
+        """ Complete the current frame taking seconds to render """
+        self.current.seconds = seconds
+        self.complete(self.current)
+        self.current = None
+
+    def complete(self, frame):
+        """ Record a finished frame and flag it if it is a spike """
+        neighbours = sorted(f.seconds for f in self.frames[-self.window:])
+        if neighbours:
+            frame.spike = \
+                frame.seconds > self.spike_factor * percentile(neighbours, 0.5)
+        self.frames.append(frame)
+        bisect.insort(self.ordered_seconds, frame.seconds)
+        if self.on_frame:
+            self.on_frame(self, frame)
+
+    def percentile(self, fraction):
+        """ Running percentile of frame render times in seconds """
+        return percentile(self.ordered_seconds, fraction)
+
+    def eta(self):
+        """ Estimated seconds to render the remaining frames or None if the
+            last frame is not known """
+        if self.frame_end is None or not self.frames:
+            return None
+        remaining = max(0, self.frame_end - self.frames[-1].number)
+        recent = sorted(f.seconds for f in self.frames[-self.window:])
+        return remaining * percentile(recent, 0.5)
+
+    def spikes(self):
+        """ Frames flagged as spikes """
+        return [frame for frame in self.frames if frame.spike]
+
+    def frame_line(self, frame):
+        """ One line summary of a completed frame """
+        line = "telemetry: frame %d %.2fs peak %.2fM p50 %.2fs p95 %.2fs" % (
+            frame.number, frame.seconds, frame.peak_mb,
+            self.percentile(0.5), self.percentile(0.95))
+        eta = self.eta()
+        if eta is not None:
+            line += " eta %s" % format_time(eta)
+        if frame.spike:
+            line += " SPIKE"
+        return line
+
+    def summary(self):
+        """ Lines summarising the whole render """
+        if not self.frames:
+            return ["telemetry: no frames rendered"]
+        total = sum(frame.seconds for frame in self.frames)
+        lines = [
+            "telemetry: %d frames in %s" % (len(self.frames), format_time(total)),
+            "telemetry: p50 %.2fs p90 %.2fs p99 %.2fs max %.2fs" % (
+                self.percentile(0.5), self.percentile(0.9),
+                self.percentile(0.99), self.ordered_seconds[-1]),
+            "telemetry: peak memory %.2fM" % max(
+                frame.peak_mb for frame in self.frames),
+        ]
+        for frame in self.spikes():
+            lines.append("telemetry: spike frame %d %.2fs %s" % (
+                frame.number, frame.seconds, frame.filename))
+        return lines
+
+
+def print_frame(telemetry, frame):
+    """ on_frame callback printing a frame line as soon as it completes """
+    print(telemetry.frame_line(frame), flush=True)
+
+
+def stream(lines, telemetry, echo=True):
+    """ Feed lines into telemetry echoing them to stdout """
+    for line in lines:
+        if echo:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        telemetry.feed(line)
+
+
+def main():
+    """ Render or replay a log printing telemetry as frames complete """
+    parser = argparse.ArgumentParser(
+        description="Per-frame telemetry for Blender --render-anim output")
+    parser.add_argument('--frame-end', type=int, default=None,
+                        help="last frame of the animation, enables the ETA")
+    parser.add_argument('--window', type=int, default=9,
+                        help="number of neighbouring frames used for spikes")
+    parser.add_argument('--spike-factor', type=float, default=2.0,
+                        help="multiple of the neighbour median that is a spike")
+    parser.add_argument('--log', default=None,
+                        help="replay a recorded render log instead of running")
+    parser.add_argument('--quiet', action='store_true',
+                        help="do not echo the render output")
+    parser.add_argument('command', nargs=argparse.REMAINDER,
+                        help="-- followed by the blender command line")
+    args = parser.parse_args()
+
+    telemetry = RenderTelemetry(frame_end=args.frame_end, window=args.window,
+                                spike_factor=args.spike_factor,
+                                on_frame=print_frame)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+
+    status = 0
+    if args.log:
+        with open(args.log, errors='replace') as log:
+            stream(log, telemetry, echo=not args.quiet)
+    elif command:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT,
+                                   universal_newlines=True, errors='replace')
+        stream(process.stdout, telemetry, echo=not args.quiet)
+        status = process.wait()
+    else:
+        parser.error("either --log or a command is required")
+
+    for line in telemetry.summary():
+        print(line)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())